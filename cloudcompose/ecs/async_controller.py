@@ -0,0 +1,430 @@
+import asyncio
+import atexit
+import logging
+import threading
+import weakref
+from contextlib import AsyncExitStack
+from functools import wraps
+from itertools import chain
+from os import environ
+from pprint import pprint
+
+import botocore
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from cloudcompose.exceptions import CloudComposeException
+
+MAX_POOL_CONNECTIONS = 100
+
+_event_loop = None
+_event_loop_thread = None
+_event_loop_lock = threading.Lock()
+_open_controllers = weakref.WeakSet()
+
+
+def shared_event_loop():
+    """
+    The event loop shared by every controller in this process. It runs forever on a dedicated
+    daemon thread so that coroutines can be submitted to it from any other thread.
+    :return: asyncio event loop
+    """
+    global _event_loop, _event_loop_thread
+    with _event_loop_lock:
+        if _event_loop is None or _event_loop.is_closed():
+            _event_loop = asyncio.new_event_loop()
+            _event_loop_thread = threading.Thread(target=_event_loop.run_forever, name='ecs-event-loop')
+            _event_loop_thread.daemon = True
+            _event_loop_thread.start()
+        return _event_loop
+
+
+def run(coroutine):
+    """
+    Runs a coroutine on the shared event loop and waits for its result. Safe to call from any
+    thread except the event loop thread itself, where the coroutine must be awaited instead.
+    :param coroutine: coroutine to run
+    :return: result of the coroutine
+    """
+    loop = shared_event_loop()
+    if _running_loop() is loop:
+        coroutine.close()
+        raise RuntimeError('run() cannot be called from the shared event loop, await the coroutine instead')
+    return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+
+@atexit.register
+def _close_shared_event_loop():
+    """
+    Closes every open AsyncController and stops the shared event loop when the process exits
+    """
+    global _event_loop
+    with _event_loop_lock:
+        loop, _event_loop = _event_loop, None
+    if loop is None or loop.is_closed():
+        return
+
+    async def close_controllers():
+        await asyncio.gather(*[controller.close() for controller in list(_open_controllers)],
+                             return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(close_controllers(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    _event_loop_thread.join()
+    loop.close()
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+async def _cancel(tasks):
+    for task in tasks:
+        task.cancel()
+    # Retrieve the results so failed tasks are not reported as never retrieved
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _gather(*coroutines):
+    """
+    Like asyncio.gather, but cancels the remaining coroutines as soon as one of them fails
+    """
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        await _cancel(tasks)
+        raise
+
+
+def _is_retryable_exception(exception):
+    return not isinstance(exception, botocore.exceptions.ClientError)
+
+
+def retry(stop_max_delay, wait_exponential_multiplier, wait_exponential_max):
+    """
+    Coroutine counterpart of retrying.retry for the options used by the controllers
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            attempt = 0
+            while True:
+                try:
+                    return await func(*args, **kwargs)
+                except asyncio.CancelledError:
+                    # CancelledError is an Exception before Python 3.8 and must never be retried
+                    raise
+                except Exception as ex:
+                    attempt += 1
+                    elapsed = (loop.time() - start) * 1000
+                    if not _is_retryable_exception(ex) or elapsed >= stop_max_delay:
+                        raise
+                    wait = min(wait_exponential_multiplier * 2 ** attempt, wait_exponential_max)
+                    await asyncio.sleep(wait / 1000.0)
+        return wrapper
+    return decorator
+
+
+class AsyncController(object):
+    def __init__(self, cloud_config):
+        self.logger = logging.getLogger(__name__)
+        self.verbose = False
+
+        self.cloud_config = cloud_config
+        self.config_data = cloud_config.config_data('cluster')
+        self.name = self.config_data['name']
+
+        self.session = get_session()
+        self._clients = None
+        self._opening = None
+        self.ecs = None
+        self.asg = None
+        self.elb = None
+        self.alb = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def open(self):
+        """
+        Create the AWS clients. Each client keeps one connection pool that is shared by every
+        concurrent request made through this controller.
+        """
+        # Created here rather than in __init__ so the lock belongs to the running event loop
+        if self._opening is None:
+            self._opening = asyncio.Lock()
+
+        async with self._opening:
+            if self._clients is not None:
+                return
+
+            clients = AsyncExitStack()
+            try:
+                self.ecs = await clients.enter_async_context(self._create_client('ecs'))
+                self.asg = await clients.enter_async_context(self._create_client('autoscaling'))
+                self.elb = await clients.enter_async_context(self._create_client('elb'))
+                self.alb = await clients.enter_async_context(self._create_client('elbv2'))
+            except BaseException:
+                await clients.aclose()
+                raise
+            self._clients = clients
+            _open_controllers.add(self)
+
+    async def close(self):
+        """
+        Close the AWS clients and their connection pools
+        """
+        if self._clients is None:
+            return
+
+        clients, self._clients = self._clients, None
+        _open_controllers.discard(self)
+        await clients.aclose()
+
+    def _create_client(self, client):
+        return self.session.create_client(client,
+                                          region_name=environ.get('AWS_REGION', 'us-east-1'),
+                                          config=AioConfig(max_pool_connections=MAX_POOL_CONNECTIONS))
+
+    async def cluster_health(self, verbose=False):
+        """
+        ECS cluster must be active, EC2 instances must be active, and services must be active.
+        :param verbose: Output detailed health information about cluster
+        :return: boolean representing health of entire ECS cluster
+        """
+        self.verbose = verbose
+        health_checks = await self.health_checks()
+        return all(health_checks.values())
+
+    async def health_checks(self):
+        """
+        Runs each of the ECS cluster health checks concurrently, or one after another when verbose
+        so that the output of each check is not interleaved.
+        :return: dict mapping the name of each check to a boolean representing its health
+        """
+        checks = [self._cluster_health, self._instance_health, self._service_health]
+        if self.verbose:
+            cluster, instances, services = [await check() for check in checks]
+        else:
+            cluster, instances, services = await _gather(*[check() for check in checks])
+        return {
+            'cluster': cluster,
+            'instances': instances,
+            'services': services
+        }
+
+    async def _get_cluster(self):
+        try:
+            clusters = await self._ecs_describe_clusters(clusters=[self.name, ])
+            if not clusters['clusters']:
+                raise CloudComposeException("{} cluster could not be found".format(self.name))
+            return clusters['clusters']
+        except KeyError:
+            raise CloudComposeException("Could not retrieve cluster status for {}".format(self.name))
+
+    async def _get_ecs_services(self):
+        """
+        Pages through the services on the cluster, describing each page while the next one is listed.
+        :return: list of ECS service descriptions
+        """
+        describe_services = []
+        next_token = None
+
+        try:
+            while True:
+                if next_token:
+                    cluster_services = await self._ecs_list_services(cluster=self.name, nextToken=next_token)
+                else:
+                    cluster_services = await self._ecs_list_services(cluster=self.name)
+
+                service_arns = cluster_services.get('serviceArns', [])
+                if not service_arns:
+                    raise CloudComposeException("Services could not be retrieved for {}".format(self.name))
+
+                describe_services.append(asyncio.ensure_future(
+                    self._ecs_describe_services(cluster=self.name, services=service_arns)))
+
+                next_token = cluster_services.get('nextToken')
+                if not next_token:
+                    break
+
+            pages = await asyncio.gather(*describe_services)
+        except BaseException:
+            await _cancel(describe_services)
+            raise
+
+        return list(chain.from_iterable([page['services'] for page in pages]))
+
+    async def _get_ecs_instances(self):
+        try:
+            ecs_instances = await self._ecs_list_container_instances(cluster=self.name)
+            instances = await self._ecs_describe_container_instances(
+                cluster=self.name, containerInstances=ecs_instances['containerInstanceArns'])
+            return instances['containerInstances']
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            raise CloudComposeException(
+                'ECS container instances could not be retrieved for {}'.format(self.name))
+
+    async def _get_auto_scaling_group(self):
+        try:
+            asgs = await self._asg_describe_auto_scaling_groups(AutoScalingGroupNames=[self.name, ])
+            if len(asgs['AutoScalingGroups']) == 1:
+                return asgs['AutoScalingGroups'].pop()
+            else:
+                raise CloudComposeException('{} ASG is not unique'.format(self.name))
+        except KeyError:
+            raise CloudComposeException('AutoScalingGroup could not be retrieved for {}'.format(self.name))
+
+    async def _cluster_health(self):
+        """
+        The status of the cluster.
+        :return: boolean representing status of the cluster
+        """
+        clusters = await self._get_cluster()
+        # ACTIVE indicates that you can register container instances with the cluster and instances can accept tasks.
+
+        if self.verbose:
+            self._verbose_log("Cluster Health", clusters)
+
+        return all([cluster['status'] == 'ACTIVE' and cluster['pendingTasksCount'] == 0 for cluster in clusters])
+
+    async def _service_health(self):
+        """
+        The status of services running on the cluster.
+        :return: boolean representing status of all services
+        """
+        services = await self._get_ecs_services()
+
+        if self.verbose:
+            for service in services:
+                if service['status'] != 'ACTIVE':
+                    self._verbose_log("Service {} is not active".format(service['serviceName']))
+                elif service['runningCount'] != service['desiredCount']:
+                    self._verbose_log("Service {} is not running at the desired scale".format(service['serviceName']))
+
+        if services:
+            load_balancers = list(chain.from_iterable([service.get('loadBalancers', []) for service in services]))
+            load_balancers_healthy = await self._check_load_balancers(load_balancers)
+
+            return all(
+                [service['status'] == 'ACTIVE' and service['runningCount'] == service['desiredCount'] for service in
+                 services]) and load_balancers_healthy
+        else:
+            # If there are no services running, there are no tasks to worry about.
+            return True
+
+    async def _check_load_balancers(self, load_balancers):
+        """
+        The status of load balancers used by services on the cluster. Every load balancer is described concurrently.
+        :param load_balancer is a list of load balancers used by the services running on the cluster
+        :return: boolean representing status of all load balancers
+        """
+        albs = [_f for _f in [lb.get('targetGroupArn', None) for lb in load_balancers] if _f]
+        elbs = [_f for _f in [lb.get('loadBalancerName', None) for lb in load_balancers] if _f]
+
+        alb_healths, elb_healths = await _gather(
+            _gather(*[self._alb_describe_target_health(TargetGroupArn=alb) for alb in albs]),
+            _gather(*[self._elb_describe_instance_health(LoadBalancerName=elb) for elb in elbs])
+        )
+
+        if self.verbose:
+            for alb, target_group_health in zip(albs, alb_healths):
+                for target in target_group_health.get('TargetHealthDescriptions', []):
+                    if target['TargetHealth']['State'] != 'healthy':
+                        self._verbose_log("Instance {} is unhealthy in target group:\n{}"
+                                          .format(target['Target']['Id'], alb), target)
+
+            for elb, elb_health in zip(elbs, elb_healths):
+                for instance in elb_health['InstanceStates']:
+                    if instance['State'] != 'InService':
+                        self._verbose_log("Instance {} in ELB {} is unhealthy"
+                                          .format(instance['InstanceId'], elb), instance)
+
+        alb_statuses = list(chain.from_iterable([
+            alb_status.get('TargetHealthDescriptions', []) for alb_status in alb_healths
+        ]))
+
+        elb_statuses = list(chain.from_iterable([
+            elb_status['InstanceStates'] for elb_status in elb_healths
+        ]))
+
+        alb_healthy = all([alb['TargetHealth']['State'] == 'healthy' for alb in alb_statuses])
+        elb_healthy = all([elb['State'] == 'InService' for elb in elb_statuses])
+
+        return alb_healthy and elb_healthy
+
+    async def _instance_health(self):
+        """
+        The status of the container instances.
+        """
+        instances, asg = await _gather(self._get_ecs_instances(), self._get_auto_scaling_group())
+        if len(instances) != asg['DesiredCapacity']:
+            if self.verbose:
+                print(("ECS cluster is not at desired capacity of {}".format(asg['DesiredCapacity'])))
+            return False
+        else:
+            if self.verbose:
+                for instance in instances:
+                    if instance['status'] != 'ACTIVE':
+                        print(("{} is not active".format(instance['ec2InstanceId'])))
+
+            return all([instance['status'] == 'ACTIVE' for instance in instances])
+
+    @staticmethod
+    def _verbose_log(title, output=None):
+        """
+        Outputs verbose information about the health check
+        :param title: Text to insert into banner
+        :param output: Contents to be pretty printed (detailed API response)
+        """
+        print(("=" * 80))
+        print(title)
+        if output:
+            print(("=" * 80))
+            pprint(output)
+
+    @retry(stop_max_delay=10000, wait_exponential_multiplier=500, wait_exponential_max=2000)
+    async def _ecs_describe_clusters(self, **kwargs):
+        return await self.ecs.describe_clusters(**kwargs)
+
+    @retry(stop_max_delay=10000, wait_exponential_multiplier=500, wait_exponential_max=2000)
+    async def _ecs_list_services(self, **kwargs):
+        return await self.ecs.list_services(**kwargs)
+
+    @retry(stop_max_delay=10000, wait_exponential_multiplier=500, wait_exponential_max=2000)
+    async def _ecs_describe_services(self, **kwargs):
+        return await self.ecs.describe_services(**kwargs)
+
+    @retry(stop_max_delay=10000, wait_exponential_multiplier=500, wait_exponential_max=2000)
+    async def _ecs_list_container_instances(self, **kwargs):
+        return await self.ecs.list_container_instances(**kwargs)
+
+    @retry(stop_max_delay=10000, wait_exponential_multiplier=500, wait_exponential_max=2000)
+    async def _ecs_describe_container_instances(self, **kwargs):
+        return await self.ecs.describe_container_instances(**kwargs)
+
+    @retry(stop_max_delay=10000, wait_exponential_multiplier=500, wait_exponential_max=2000)
+    async def _asg_describe_auto_scaling_groups(self, **kwargs):
+        return await self.asg.describe_auto_scaling_groups(**kwargs)
+
+    @retry(stop_max_delay=10000, wait_exponential_multiplier=500, wait_exponential_max=2000)
+    async def _alb_describe_target_health(self, **kwargs):
+        try:
+            return await self.alb.describe_target_health(**kwargs)
+        except self.alb.exceptions.TargetGroupNotFoundException:
+            return {}
+
+    @retry(stop_max_delay=10000, wait_exponential_multiplier=500, wait_exponential_max=2000)
+    async def _elb_describe_instance_health(self, **kwargs):
+        return await self.elb.describe_instance_health(**kwargs)
@@ -1,5 +1,7 @@
 import click
+from cloudcompose.ecs.async_controller import AsyncController
 from cloudcompose.ecs.controller import Controller
+from cloudcompose.ecs.exporter import HealthExporter
 from cloudcompose.config import CloudConfig
 from cloudcompose.exceptions import CloudComposeException
 
@@ -56,6 +58,25 @@ def health(verbose):
         print((ex.message))
 
 
+@cli.command()
+@click.option('--host', default='0.0.0.0', help="Address to serve health information on")
+@click.option('--port', default=8080, type=int, help="Port to serve health information on")
+@click.option('--interval', default=30, type=click.IntRange(min=1), help="Seconds between background health checks")
+def serve(host, port, interval):
+    """
+    serve ECS cluster health and metrics over HTTP
+    """
+    try:
+        cloud_config = CloudConfig()
+        controller = AsyncController(cloud_config)
+        exporter = HealthExporter([controller], interval)
+        exporter.serve(host, port)
+    except CloudComposeException as ex:
+        print((ex.message))
+    except OSError as ex:
+        print(("Could not serve ECS cluster health on {}:{}: {}".format(host, port, ex.strerror)))
+
+
 @cli.command()
 @click.option('--single-step/--no-single-step', default=False, help="Perform only one upgrade step and then exit")
 @click.option('--upgrade-image/--no-upgrade-image', default=True, help="Upgrade the image to the newest version instead of keeping the cluster consistent")
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .async_controller import run
+
+
+class HealthExporter(object):
+    """
+    Keeps health snapshots of ECS clusters in memory and serves them over HTTP.
+
+    Every AsyncController is refreshed concurrently on the shared event loop from a
+    background thread every `interval` seconds.
+    The /health and /metrics responses are rendered once per refresh, so requests
+    are answered from memory without any AWS traffic. /health reports unhealthy once
+    the snapshots are older than two refresh intervals.
+    """
+    CONTENT_TYPE_JSON = 'application/json'
+    CONTENT_TYPE_METRICS = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self, controllers, interval=30):
+        if interval <= 0:
+            raise ValueError('interval must be a positive number of seconds, got {}'.format(interval))
+
+        self.logger = logging.getLogger(__name__)
+        self.controllers = controllers
+        self.interval = interval
+        self.snapshots = []
+        self.refresh_errors = dict((controller.name, 0) for controller in controllers)
+        self._render()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.server = None
+
+    def refresh(self):
+        """
+        Refreshes the health snapshot of every cluster and re-renders the responses.
+        """
+        self.snapshots = run(self._snapshots())
+        self._render()
+
+    def start(self):
+        """
+        Starts refreshing health snapshots on a background thread.
+        """
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name='ecs-health-refresh')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background refresh thread.
+        """
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def serve(self, host, port):
+        """
+        Binds the HTTP server, takes an initial snapshot and then serves /health and /metrics
+        until interrupted or shut down.
+        :param host: address to bind the HTTP server to
+        :param port: port to bind the HTTP server to
+        """
+        try:
+            self.server = ThreadingHTTPServer((host, port), HealthRequestHandler)
+            self.server.daemon_threads = True
+            self.server.exporter = self
+
+            self.refresh()
+            self.start()
+            print(("Serving ECS cluster health on http://{}:{}".format(*self.server.server_address)))
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if self.server:
+                self.server.server_close()
+            self.stop()
+            run(self._close())
+
+    def shutdown(self):
+        """
+        Stops a running serve() from another thread.
+        """
+        if self.server:
+            self.server.shutdown()
+
+    def response(self, path):
+        """
+        Looks up the pre-rendered response for a request path.
+        :param path: request path
+        :return: tuple of (HTTP status, content type, body) or None if the path is unknown
+        """
+        updated_at, stale_health, responses = self._state
+        if path == '/health' and updated_at is not None and time.time() - updated_at > 2 * self.interval:
+            return stale_health
+        return responses.get(path)
+
+    def _refresh_loop(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                self.logger.exception("Health refresh failed")
+
+    async def _snapshots(self):
+        return await asyncio.gather(*[self._snapshot(controller) for controller in self.controllers])
+
+    async def _close(self):
+        await asyncio.gather(*[controller.close() for controller in self.controllers])
+
+    async def _snapshot(self, controller):
+        snapshot = {
+            'name': controller.name,
+            'healthy': False,
+            'checks': {},
+            'error': None,
+            'updated_at': time.time()
+        }
+        try:
+            await controller.open()
+            checks = await controller.health_checks()
+            snapshot['checks'] = checks
+            snapshot['healthy'] = all(checks.values())
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            # Only the class name is exposed since AWS error messages include ARNs and account IDs
+            self.logger.exception("Health check failed for %s", controller.name)
+            self.refresh_errors[controller.name] += 1
+            snapshot['error'] = ex.__class__.__name__
+        return snapshot
+
+    def _render(self):
+        healthy = bool(self.snapshots) and all([snapshot['healthy'] for snapshot in self.snapshots])
+        health = json.dumps({'healthy': healthy, 'stale': False, 'clusters': self.snapshots}).encode('utf-8')
+        stale_health = json.dumps({'healthy': False, 'stale': True, 'clusters': self.snapshots}).encode('utf-8')
+        metrics = self._render_metrics().encode('utf-8')
+
+        updated_at = max([snapshot['updated_at'] for snapshot in self.snapshots]) if self.snapshots else None
+        responses = {
+            '/health': (200 if healthy else 503, self.CONTENT_TYPE_JSON, health),
+            '/metrics': (200, self.CONTENT_TYPE_METRICS, metrics)
+        }
+        # Published with a single assignment so request threads never see a partially updated state
+        self._state = (updated_at, (503, self.CONTENT_TYPE_JSON, stale_health), responses)
+
+    def _render_metrics(self):
+        lines = [
+            '# HELP ecs_cluster_healthy Whether the ECS cluster passed every health check.',
+            '# TYPE ecs_cluster_healthy gauge'
+        ]
+        for snapshot in self.snapshots:
+            lines.append('ecs_cluster_healthy{cluster="%s"} %d' % (_escape(snapshot['name']), snapshot['healthy']))
+
+        lines.extend([
+            '# HELP ecs_cluster_check_healthy Whether the ECS cluster passed an individual health check.',
+            '# TYPE ecs_cluster_check_healthy gauge'
+        ])
+        for snapshot in self.snapshots:
+            for check, healthy in sorted(snapshot['checks'].items()):
+                lines.append('ecs_cluster_check_healthy{cluster="%s",check="%s"} %d'
+                             % (_escape(snapshot['name']), _escape(check), healthy))
+
+        lines.extend([
+            '# HELP ecs_cluster_health_updated_timestamp_seconds When the ECS cluster health was last refreshed.',
+            '# TYPE ecs_cluster_health_updated_timestamp_seconds gauge'
+        ])
+        for snapshot in self.snapshots:
+            lines.append('ecs_cluster_health_updated_timestamp_seconds{cluster="%s"} %.3f'
+                         % (_escape(snapshot['name']), snapshot['updated_at']))
+
+        lines.extend([
+            '# HELP ecs_cluster_health_refresh_errors_total Number of ECS cluster health refreshes that failed.',
+            '# TYPE ecs_cluster_health_refresh_errors_total counter'
+        ])
+        for name, errors in sorted(self.refresh_errors.items()):
+            lines.append('ecs_cluster_health_refresh_errors_total{cluster="%s"} %d' % (_escape(name), errors))
+
+        return '\n'.join(lines) + '\n'
+
+
+class HealthRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        response = self.server.exporter.response(self.path.split('?', 1)[0])
+        if response is None:
+            self.send_error(404)
+            return
+
+        status, content_type, body = response
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format, *args)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -7,10 +7,11 @@ setup(
     version='0.4.0',
     description='ECS plugin for cloud-compose',
     packages=find_packages(),
+    python_requires='>=3.7',
     include_package_data=True,
     install_requires=[
         'click>=6.6',
-        'boto3>=1.3.1',
+        'aiobotocore[boto3]>=1.0.0',
         'cloud-compose>=0.4.0',
         'cloud-compose-cluster>=0.14.0'
     ],
@@ -19,6 +20,7 @@ setup(
     ],
     tests_require=[
         'pytest',
+        'moto[server]',
     ],
     namespace_packages = ['cloudcompose'],
     author="WaPo platform tools team",
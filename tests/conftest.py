@@ -0,0 +1,142 @@
+import json
+import os
+import socket
+from urllib.request import Request, urlopen
+
+import boto3
+import pytest
+from moto.server import ThreadedMotoServer
+
+from cloudcompose.ecs.async_controller import AsyncController, run
+
+CLUSTER_NAME = 'test-cluster'
+
+
+class StubCloudConfig(object):
+    """
+    Stands in for cloudcompose.config.CloudConfig without reading cloud-compose.yml
+    """
+    def __init__(self, name=CLUSTER_NAME):
+        self.name = name
+
+    def config_data(self, section):
+        return {'name': self.name, 'aws': {}}
+
+
+class Cluster(object):
+    """
+    Builds an ECS cluster in the local AWS stand-in
+    """
+    def __init__(self, name=CLUSTER_NAME):
+        self.name = name
+        self.ec2 = boto3.client('ec2')
+        self.ecs = boto3.client('ecs')
+        self.asg = boto3.client('autoscaling')
+        self.elb = boto3.client('elb')
+        self.alb = boto3.client('elbv2')
+        self.instance_ids = []
+        self.target_group_arn = None
+        self.load_balancer_name = 'test-elb'
+
+    def create(self, instances=2, registered=None, services=1, running=True):
+        self.ecs.create_cluster(clusterName=self.name)
+        self.asg.create_launch_configuration(LaunchConfigurationName=self.name, ImageId='ami-12c6146b',
+                                             InstanceType='t2.micro')
+        self.asg.create_auto_scaling_group(AutoScalingGroupName=self.name, LaunchConfigurationName=self.name,
+                                           MinSize=0, MaxSize=instances, DesiredCapacity=instances,
+                                           AvailabilityZones=['us-east-1a'])
+        groups = self.asg.describe_auto_scaling_groups(AutoScalingGroupNames=[self.name])['AutoScalingGroups']
+        self.instance_ids = [instance['InstanceId'] for instance in groups[0]['Instances']]
+
+        registered = instances if registered is None else registered
+        for instance_id in self.instance_ids[:registered]:
+            self.ecs.register_container_instance(cluster=self.name,
+                                                 instanceIdentityDocument=json.dumps({'instanceId': instance_id}))
+
+        vpc_id = self.ec2.describe_vpcs()['Vpcs'][0]['VpcId']
+        self.target_group_arn = self.alb.create_target_group(
+            Name='test-tg', Protocol='HTTP', Port=80, VpcId=vpc_id)['TargetGroups'][0]['TargetGroupArn']
+        self.alb.register_targets(TargetGroupArn=self.target_group_arn,
+                                  Targets=[{'Id': instance_id} for instance_id in self.instance_ids])
+        self.elb.create_load_balancer(LoadBalancerName=self.load_balancer_name, AvailabilityZones=['us-east-1a'],
+                                      Listeners=[{'Protocol': 'http', 'LoadBalancerPort': 80, 'InstancePort': 80}])
+        self.elb.register_instances_with_load_balancer(
+            LoadBalancerName=self.load_balancer_name,
+            Instances=[{'InstanceId': instance_id} for instance_id in self.instance_ids])
+
+        self.ecs.register_task_definition(family='web', containerDefinitions=[
+            {'name': 'web', 'image': 'nginx', 'memory': 128}])
+        load_balancers = [
+            [{'targetGroupArn': self.target_group_arn, 'containerName': 'web', 'containerPort': 80}],
+            [{'loadBalancerName': self.load_balancer_name, 'containerName': 'web', 'containerPort': 80}]
+        ]
+        for i in range(services):
+            self.create_service('web-{}'.format(i), load_balancers[i % 2] if i < 2 else [], running)
+        return self
+
+    def create_service(self, name, load_balancers=None, running=True):
+        # The stand-in reports this many running tasks for each new service
+        os.environ['MOTO_ECS_SERVICE_RUNNING'] = '1' if running else '0'
+        try:
+            self.ecs.create_service(cluster=self.name, serviceName=name, taskDefinition='web', desiredCount=1,
+                                    loadBalancers=load_balancers or [])
+        finally:
+            del os.environ['MOTO_ECS_SERVICE_RUNNING']
+
+    def stop_instance(self, instance_id):
+        self.ec2.stop_instances(InstanceIds=[instance_id])
+
+
+def _free_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@pytest.fixture(scope='session')
+def aws_endpoint():
+    """
+    Local stand-in for the AWS APIs that both boto3 and aiobotocore clients are pointed at
+    """
+    port = _free_port()
+    server = ThreadedMotoServer(ip_address='127.0.0.1', port=port, verbose=False)
+    server.start()
+
+    endpoint = 'http://127.0.0.1:{}'.format(port)
+    environment = {
+        'AWS_ENDPOINT_URL': endpoint,
+        'AWS_ACCESS_KEY_ID': 'testing',
+        'AWS_SECRET_ACCESS_KEY': 'testing',
+        'AWS_REGION': 'us-east-1',
+        'AWS_DEFAULT_REGION': 'us-east-1'
+    }
+    original = dict((key, os.environ.get(key)) for key in environment)
+    os.environ.update(environment)
+    yield endpoint
+
+    for key, value in original.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+    server.stop()
+
+
+@pytest.fixture
+def aws(aws_endpoint):
+    yield aws_endpoint
+    urlopen(Request(aws_endpoint + '/moto-api/reset', method='POST')).close()
+
+
+@pytest.fixture
+def cluster(aws):
+    return Cluster()
+
+
+@pytest.fixture
+def async_controller(aws):
+    controller = AsyncController(StubCloudConfig())
+    yield controller
+    run(controller.close())
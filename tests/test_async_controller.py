@@ -0,0 +1,213 @@
+import asyncio
+
+import botocore
+import pytest
+from cloudcompose.exceptions import CloudComposeException
+
+from cloudcompose.ecs.async_controller import retry, run
+
+
+def client_error(code='ClusterNotFoundException'):
+    return botocore.exceptions.ClientError({'Error': {'Code': code, 'Message': code}}, 'Operation')
+
+
+def counting(method, failures=()):
+    """
+    Wraps a client method, raising each of `failures` in turn before delegating to it
+    """
+    failures = list(failures)
+
+    async def wrapper(**kwargs):
+        wrapper.calls.append(kwargs)
+        if failures:
+            raise failures.pop(0)
+        return await method(**kwargs)
+
+    wrapper.calls = []
+    return wrapper
+
+
+async def is_cancelled(coroutine):
+    try:
+        await coroutine
+    except asyncio.CancelledError:
+        return True
+    return False
+
+
+def open_controller(controller):
+    run(controller.open())
+    return controller
+
+
+def test_retry_retries_until_success():
+    @retry(stop_max_delay=1000, wait_exponential_multiplier=1, wait_exponential_max=2)
+    async def flaky():
+        flaky.calls += 1
+        if flaky.calls < 3:
+            raise botocore.exceptions.EndpointConnectionError(endpoint_url='http://localhost')
+        return 'ok'
+
+    flaky.calls = 0
+    assert run(flaky()) == 'ok'
+    assert flaky.calls == 3
+
+
+def test_retry_does_not_retry_client_errors():
+    @retry(stop_max_delay=1000, wait_exponential_multiplier=1, wait_exponential_max=2)
+    async def rejected():
+        rejected.calls += 1
+        raise client_error()
+
+    rejected.calls = 0
+    with pytest.raises(botocore.exceptions.ClientError):
+        run(rejected())
+    assert rejected.calls == 1
+
+
+def test_retry_gives_up_after_max_delay():
+    @retry(stop_max_delay=50, wait_exponential_multiplier=5, wait_exponential_max=10)
+    async def unavailable():
+        unavailable.calls += 1
+        raise ConnectionError()
+
+    unavailable.calls = 0
+    with pytest.raises(ConnectionError):
+        run(unavailable())
+    assert 1 < unavailable.calls < 50
+
+
+def test_retry_does_not_retry_cancellation():
+    @retry(stop_max_delay=10000, wait_exponential_multiplier=500, wait_exponential_max=2000)
+    async def cancelled():
+        cancelled.calls += 1
+        raise asyncio.CancelledError()
+
+    cancelled.calls = 0
+    assert run(is_cancelled(cancelled())) is True
+    assert cancelled.calls == 1
+
+
+def test_concurrent_open_creates_one_set_of_clients(aws, async_controller):
+    create_client = async_controller._create_client
+    created = []
+
+    def counting_create_client(client):
+        created.append(client)
+        return create_client(client)
+
+    async_controller._create_client = counting_create_client
+
+    async def open_concurrently():
+        await asyncio.gather(*[async_controller.open() for _ in range(5)])
+
+    run(open_concurrently())
+    assert sorted(created) == ['autoscaling', 'ecs', 'elb', 'elbv2']
+
+
+def test_get_ecs_instances_passes_cancellation_through(aws, async_controller):
+    open_controller(async_controller)
+
+    async def cancelled(**kwargs):
+        raise asyncio.CancelledError()
+
+    async_controller.ecs.list_container_instances = cancelled
+    assert run(is_cancelled(async_controller._get_ecs_instances())) is True
+
+
+def test_aws_calls_retry_transient_errors(cluster, async_controller):
+    cluster.create()
+    open_controller(async_controller)
+    describe = counting(async_controller.ecs.describe_clusters,
+                        [botocore.exceptions.EndpointConnectionError(endpoint_url='http://localhost')])
+    async_controller.ecs.describe_clusters = describe
+
+    clusters = run(async_controller._get_cluster())
+    assert [c['clusterName'] for c in clusters] == [cluster.name]
+    assert len(describe.calls) == 2
+
+
+def test_aws_calls_do_not_retry_client_errors(aws, async_controller):
+    open_controller(async_controller)
+    describe = counting(async_controller.elb.describe_instance_health)
+    async_controller.elb.describe_instance_health = describe
+
+    with pytest.raises(botocore.exceptions.ClientError):
+        run(async_controller._elb_describe_instance_health(LoadBalancerName='missing-elb'))
+    assert len(describe.calls) == 1
+
+
+def test_get_ecs_services_pages(cluster, async_controller):
+    cluster.create(services=5)
+    open_controller(async_controller)
+    list_services = async_controller.ecs.list_services
+
+    async def paged_list_services(nextToken='0', **kwargs):
+        # The stand-in returns every service at once, so split them into pages of two
+        service_arns = (await list_services(**kwargs))['serviceArns']
+        start = int(nextToken)
+        page = {'serviceArns': service_arns[start:start + 2]}
+        if start + 2 < len(service_arns):
+            page['nextToken'] = str(start + 2)
+        return page
+
+    describe = counting(async_controller.ecs.describe_services)
+    async_controller.ecs.list_services = paged_list_services
+    async_controller.ecs.describe_services = describe
+
+    services = run(async_controller._get_ecs_services())
+    assert [service['serviceName'] for service in services] == ['web-{}'.format(i) for i in range(5)]
+    assert [len(call['services']) for call in describe.calls] == [2, 2, 1]
+
+
+def test_get_ecs_services_without_services(cluster, async_controller):
+    cluster.create(services=0)
+    with pytest.raises(CloudComposeException):
+        run(open_controller(async_controller)._get_ecs_services())
+
+
+def test_get_ecs_instances_wraps_errors(aws, async_controller):
+    with pytest.raises(CloudComposeException):
+        run(open_controller(async_controller)._get_ecs_instances())
+
+
+def test_missing_target_group_has_no_targets(cluster, async_controller):
+    cluster.create()
+    open_controller(async_controller)
+    missing = cluster.target_group_arn.replace('test-tg', 'missing-tg')
+    assert run(async_controller._alb_describe_target_health(TargetGroupArn=missing)) == {}
+    assert run(async_controller._check_load_balancers([{'targetGroupArn': missing}])) is True
+
+
+def test_missing_cluster_cancels_remaining_checks(cluster, async_controller):
+    cluster.create()
+    open_controller(async_controller)
+    describe_clusters = async_controller.ecs.describe_clusters
+
+    async def describe_missing_cluster(**kwargs):
+        return await describe_clusters(clusters=['missing-cluster'])
+
+    async def slow_auto_scaling_groups(**kwargs):
+        await asyncio.sleep(30)
+
+    async_controller.ecs.describe_clusters = describe_missing_cluster
+    async_controller.asg.describe_auto_scaling_groups = slow_auto_scaling_groups
+
+    with pytest.raises(CloudComposeException):
+        run(async_controller.cluster_health())
+
+    async def pending_tasks():
+        return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert run(pending_tasks()) == []
+
+
+def test_verbose_output_is_in_check_order(cluster, async_controller, capsys):
+    cluster.create(registered=1, running=False)
+
+    assert run(open_controller(async_controller).cluster_health(verbose=True)) is False
+
+    output = capsys.readouterr().out
+    assert (output.index('Cluster Health')
+            < output.index('ECS cluster is not at desired capacity of 2')
+            < output.index('Service web-0 is not running at the desired scale'))
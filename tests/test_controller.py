@@ -0,0 +1,79 @@
+from itertools import chain
+
+import boto3
+import pytest
+
+from cloudcompose.ecs.controller import Controller
+
+from .conftest import StubCloudConfig
+
+
+def synchronous_health_checks(name):
+    """
+    The health checks as Controller made them with synchronous boto3 calls
+    """
+    ecs = boto3.client('ecs')
+    asg = boto3.client('autoscaling')
+    elb = boto3.client('elb')
+    alb = boto3.client('elbv2')
+
+    clusters = ecs.describe_clusters(clusters=[name])['clusters']
+    cluster_healthy = all([c['status'] == 'ACTIVE' and c['pendingTasksCount'] == 0 for c in clusters])
+
+    instance_arns = ecs.list_container_instances(cluster=name)['containerInstanceArns']
+    instances = ecs.describe_container_instances(cluster=name, containerInstances=instance_arns)['containerInstances']
+    group = asg.describe_auto_scaling_groups(AutoScalingGroupNames=[name])['AutoScalingGroups'][0]
+    instances_healthy = (len(instances) == group['DesiredCapacity']
+                         and all([instance['status'] == 'ACTIVE' for instance in instances]))
+
+    service_arns = ecs.list_services(cluster=name)['serviceArns']
+    services = ecs.describe_services(cluster=name, services=service_arns)['services']
+    load_balancers = list(chain.from_iterable([service.get('loadBalancers', []) for service in services]))
+    alb_statuses = list(chain.from_iterable([
+        alb.describe_target_health(TargetGroupArn=lb['targetGroupArn'])['TargetHealthDescriptions']
+        for lb in load_balancers if lb.get('targetGroupArn')
+    ]))
+    elb_statuses = list(chain.from_iterable([
+        elb.describe_instance_health(LoadBalancerName=lb['loadBalancerName'])['InstanceStates']
+        for lb in load_balancers if lb.get('loadBalancerName')
+    ]))
+    services_healthy = (all([s['status'] == 'ACTIVE' and s['runningCount'] == s['desiredCount'] for s in services])
+                        and all([status['TargetHealth']['State'] == 'healthy' for status in alb_statuses])
+                        and all([status['State'] == 'InService' for status in elb_statuses]))
+
+    return {'cluster': cluster_healthy, 'instances': instances_healthy, 'services': services_healthy}
+
+
+@pytest.fixture
+def controller(aws):
+    controller = Controller(StubCloudConfig())
+    yield controller
+    controller.close()
+
+
+@pytest.mark.parametrize('scenario', [
+    {},
+    {'registered': 1},
+    {'running': False},
+    {'stopped': True},
+])
+def test_cluster_health_matches_synchronous_checks(cluster, controller, scenario):
+    scenario = dict(scenario)
+    stopped = scenario.pop('stopped', False)
+    cluster.create(services=2, **scenario)
+    if stopped:
+        cluster.stop_instance(cluster.instance_ids[0])
+
+    expected = synchronous_health_checks(cluster.name)
+    assert controller.health_checks() == expected
+    assert controller.cluster_health() == all(expected.values())
+
+
+def test_health_wrappers(cluster, controller):
+    cluster.create(services=2)
+
+    assert controller.is_fully_scaled() is True
+    assert controller.is_service_scaling() is False
+    assert len(controller._get_ecs_instances()) == 2
+    assert controller._get_auto_scaling_group()['DesiredCapacity'] == 2
+    assert controller._check_load_balancers([{'loadBalancerName': cluster.load_balancer_name}]) is True
@@ -0,0 +1,224 @@
+import json
+import socket
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+from click.testing import CliRunner
+
+from cloudcompose.ecs.async_controller import AsyncController, run
+from cloudcompose.ecs.commands import cli
+from cloudcompose.ecs.exporter import HealthExporter, HealthRequestHandler
+
+from .conftest import StubCloudConfig
+
+
+@pytest.fixture
+def exporter(async_controller):
+    return HealthExporter([async_controller], interval=30)
+
+
+@pytest.fixture
+def server(exporter):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), HealthRequestHandler)
+    server.exporter = exporter
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield 'http://127.0.0.1:{}'.format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def get(url):
+    try:
+        response = urlopen(url)
+    except HTTPError as error:
+        response = error
+    with response:
+        return response.status, response.headers['Content-Type'], response.read().decode('utf-8')
+
+
+def test_refresh_healthy_cluster(cluster, exporter):
+    cluster.create(services=2)
+    exporter.refresh()
+
+    snapshot, = exporter.snapshots
+    assert snapshot['name'] == cluster.name
+    assert snapshot['healthy'] is True
+    assert snapshot['checks'] == {'cluster': True, 'instances': True, 'services': True}
+    assert snapshot['error'] is None
+    assert exporter.refresh_errors == {cluster.name: 0}
+
+
+def test_health_is_ok_when_cluster_is_healthy(cluster, exporter, server):
+    cluster.create()
+    exporter.refresh()
+
+    status, content_type, body = get(server + '/health')
+    assert status == 200
+    assert content_type == 'application/json'
+    health = json.loads(body)
+    assert health['healthy'] is True
+    assert health['stale'] is False
+    assert [snapshot['name'] for snapshot in health['clusters']] == [cluster.name]
+
+
+def test_health_is_unavailable_when_cluster_is_unhealthy(cluster, exporter, server):
+    cluster.create(running=False)
+    exporter.refresh()
+
+    status, _, body = get(server + '/health')
+    assert status == 503
+    assert json.loads(body)['clusters'][0]['checks']['services'] is False
+
+
+def test_health_is_unavailable_before_first_refresh(server):
+    status, _, body = get(server + '/health')
+    assert status == 503
+    assert json.loads(body) == {'healthy': False, 'stale': False, 'clusters': []}
+
+
+def test_health_is_unavailable_when_stale(cluster, exporter, server):
+    cluster.create()
+    exporter.refresh()
+    exporter.snapshots[0]['updated_at'] = time.time() - 2 * exporter.interval - 1
+    exporter._render()
+
+    status, _, body = get(server + '/health')
+    assert status == 503
+    assert json.loads(body)['stale'] is True
+
+
+def test_metrics(cluster, exporter, server):
+    cluster.create(instances=1)
+    exporter.refresh()
+
+    status, content_type, body = get(server + '/metrics')
+    assert status == 200
+    assert content_type.startswith('text/plain; version=0.0.4')
+    lines = body.splitlines()
+    assert 'ecs_cluster_healthy{cluster="test-cluster"} 1' in lines
+    assert 'ecs_cluster_check_healthy{cluster="test-cluster",check="cluster"} 1' in lines
+    assert 'ecs_cluster_check_healthy{cluster="test-cluster",check="instances"} 1' in lines
+    assert 'ecs_cluster_check_healthy{cluster="test-cluster",check="services"} 1' in lines
+    assert 'ecs_cluster_health_refresh_errors_total{cluster="test-cluster"} 0' in lines
+    assert '# TYPE ecs_cluster_health_refresh_errors_total counter' in lines
+
+
+def test_refresh_error_is_counted_without_details(cluster):
+    cluster.create()
+    missing = AsyncController(StubCloudConfig('missing-cluster'))
+    exporter = HealthExporter([missing], interval=30)
+    try:
+        exporter.refresh()
+        exporter.refresh()
+    finally:
+        run(missing.close())
+
+    snapshot, = exporter.snapshots
+    assert snapshot['healthy'] is False
+    assert snapshot['error'] == 'CloudComposeException'
+    assert exporter.refresh_errors == {'missing-cluster': 2}
+    assert 'ecs_cluster_health_refresh_errors_total{cluster="missing-cluster"} 2' in exporter._render_metrics()
+
+
+def test_refresh_loop_survives_failures(exporter, monkeypatch):
+    refreshed = threading.Event()
+
+    def refresh():
+        refreshed.set()
+        raise RuntimeError('refresh failed')
+
+    monkeypatch.setattr(exporter, 'refresh', refresh)
+    exporter.interval = 0.01
+    exporter.start()
+    try:
+        assert refreshed.wait(5)
+        refreshed.clear()
+        assert refreshed.wait(5)
+        assert exporter._thread.is_alive()
+    finally:
+        exporter.stop()
+
+
+def test_unknown_path_is_not_found(server):
+    status, _, _ = get(server + '/unknown')
+    assert status == 404
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def test_serve(cluster, async_controller):
+    cluster.create()
+    exporter = HealthExporter([async_controller], interval=30)
+    thread = threading.Thread(target=exporter.serve, args=('127.0.0.1', 0))
+    thread.start()
+    try:
+        wait_for(lambda: exporter._thread is not None)
+        assert exporter._thread.is_alive()
+        assert exporter.snapshots[0]['healthy'] is True
+
+        url = 'http://127.0.0.1:{}'.format(exporter.server.server_address[1])
+        status, _, body = get(url + '/health')
+        assert status == 200
+        assert json.loads(body)['healthy'] is True
+    finally:
+        exporter.shutdown()
+        thread.join(10)
+
+    assert not thread.is_alive()
+    assert exporter._thread is None
+    assert async_controller._clients is None
+
+
+def test_serve_on_port_in_use(async_controller):
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(1)
+    exporter = HealthExporter([async_controller], interval=30)
+    try:
+        with pytest.raises(OSError):
+            exporter.serve('127.0.0.1', sock.getsockname()[1])
+    finally:
+        sock.close()
+
+    assert exporter.snapshots == []
+    assert exporter._thread is None
+    assert async_controller._clients is None
+
+
+@pytest.mark.parametrize('interval', [0, -1])
+def test_interval_must_be_positive(async_controller, interval):
+    with pytest.raises(ValueError):
+        HealthExporter([async_controller], interval=interval)
+
+
+@pytest.mark.parametrize('interval', ['0', '-5'])
+def test_cli_serve_rejects_non_positive_interval(interval):
+    result = CliRunner().invoke(cli.cli, ['serve', '--interval', interval])
+    assert result.exit_code == 2
+    assert 'Invalid value for' in result.output
+
+
+def test_cli_serve_on_port_in_use(aws, monkeypatch):
+    monkeypatch.setattr(cli, 'CloudConfig', StubCloudConfig)
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(1)
+    port = sock.getsockname()[1]
+    try:
+        result = CliRunner().invoke(cli.cli, ['serve', '--host', '127.0.0.1', '--port', str(port)])
+    finally:
+        sock.close()
+
+    assert result.exit_code == 0
+    assert 'Could not serve ECS cluster health on 127.0.0.1:{}'.format(port) in result.output